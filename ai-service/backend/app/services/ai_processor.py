@@ -1,14 +1,19 @@
 # app/services/ai_processor.py
 
+import asyncio
+import hashlib
 import os
-import json
 import logging
-from typing import Dict, List, Any, Optional
+import re
+
+import orjson
+from typing import Dict, List, Any, Optional, Tuple
 from uuid import UUID
 
+from cachetools import LRUCache
+
 # LangChain & Google GenAI Imports
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 # Import exceptions if needed for more granular error handling, e.g., from google.api_core.exceptions import GoogleAPIError
 
@@ -28,6 +33,10 @@ class AIProcessingError(Exception):
 
 logger = logging.getLogger(__name__)
 
+# Matches a response wrapped in a markdown code fence (optionally tagged "json")
+# and captures the payload, replacing several strip/startswith passes.
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
 class AIProcessorService:
     """
     Service responsible for interacting with the configured Google Generative AI model
@@ -50,24 +59,145 @@ class AIProcessorService:
                 # max_tokens=None, # Often better to let the model decide unless hitting limits
                 # timeout=None,    # Default timeout
                 max_retries=settings.AI_MAX_RETRIES,
-                convert_system_message_to_human=True # Good practice for some models
+                convert_system_message_to_human=True, # Good practice for some models
+                # One async gRPC channel is shared by every call this service
+                # makes, so concurrent (batched/chunked) requests multiplex
+                # over a single HTTP/2 connection instead of each paying a
+                # fresh TLS handshake.
+                transport="grpc_asyncio",
             )
-            logger.info(f"AI Processor Service initialized successfully with model: {settings.AI_MODEL_NAME}")
+            logger.info("AI Processor Service initialized successfully with model: %s", settings.AI_MODEL_NAME)
         except Exception as e:
-            logger.error(f"Failed to initialize ChatGoogleGenerativeAI: {e}", exc_info=True)
+            logger.error("Failed to initialize ChatGoogleGenerativeAI: %s", e, exc_info=True)
             raise AIConfigurationError(f"Failed to configure the AI model: {e}")
 
+        # Prompt template is compiled once and chained to the model; each call
+        # then only binds variables, and the chain exposes LangChain's batch
+        # fast path used by the micro-batcher and the long-document chunker.
+        self._prompt = ChatPromptTemplate.from_messages([
+            ("system", "{system_prompt}"),
+            ("human", "Here is the document content to process:\n\n---\n\n{pdf_content}\n\n---"),
+        ])
+        self.chain = self._prompt | self.llm
+
+        # In-process micro-batcher: concurrent process_content calls are coalesced
+        # into a single chain.abatch round-trip instead of N independent API calls.
+        # The worker task is started lazily since there is no loop at import time.
+        self._batch_queue: "asyncio.Queue[Tuple[Dict[str, str], asyncio.Future]]" = asyncio.Queue()
+        self._batch_task: Optional[asyncio.Task] = None
+
+        # Content-addressed result cache: re-processing an identical
+        # (system_prompt, pdf_content) pair skips the LLM round-trip entirely.
+        self._result_cache: LRUCache = LRUCache(maxsize=settings.AI_CACHE_MAX_ENTRIES)
+        self._cache_lock = asyncio.Lock()
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """ Cheap local token estimate (~4 chars/token for typical text). """
+        return len(text) // 4
+
+    @staticmethod
+    def _build_variables(system_prompt: str, content: str) -> Dict[str, str]:
+        """ Build the template variables for one model call through the chain. """
+        return {"system_prompt": system_prompt, "pdf_content": content}
+
+    @staticmethod
+    def _split_content(text: str, chunk_size: int) -> List[str]:
+        """ Split text on paragraph boundaries into chunks of roughly chunk_size chars. """
+        chunks: List[str] = []
+        current: List[str] = []
+        current_len = 0
+        for paragraph in text.split("\n\n"):
+            if current and current_len + len(paragraph) > chunk_size:
+                chunks.append("\n\n".join(current))
+                current = []
+                current_len = 0
+            current.append(paragraph)
+            current_len += len(paragraph) + 2
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+
+    @classmethod
+    def _merge_two(cls, a: Any, b: Any) -> Any:
+        """ Deep-merge two parsed chunk outputs: dicts union recursively, lists concatenate. """
+        if isinstance(a, dict) and isinstance(b, dict):
+            merged = dict(a)
+            for key, value in b.items():
+                merged[key] = cls._merge_two(merged[key], value) if key in merged else value
+            return merged
+        if isinstance(a, list) and isinstance(b, list):
+            return a + b
+        if isinstance(a, list):
+            return a + [b]
+        if a == b:
+            return a
+        return [a, b]
+
+    @classmethod
+    def _merge_outputs(cls, outputs: List[Any]) -> Any:
+        """ Fold the per-chunk structures into one merged result. """
+        merged = outputs[0]
+        for output in outputs[1:]:
+            merged = cls._merge_two(merged, output)
+        return merged
+
+    @staticmethod
+    def _cache_key(system_prompt: str, pdf_content: str) -> bytes:
+        """ Stable 128-bit digest of the full prompt inputs. """
+        return hashlib.blake2b(
+            system_prompt.encode("utf-8") + b"\x00" + pdf_content.encode("utf-8"),
+            digest_size=16,
+        ).digest()
+
+    def _ensure_batch_worker(self) -> None:
+        """ Start (or restart) the background batching task on the running loop. """
+        if self._batch_task is None or self._batch_task.done():
+            self._batch_task = asyncio.get_running_loop().create_task(self._batch_worker())
+
+    async def _batch_worker(self) -> None:
+        """
+        Drains the batch queue forever: waits for one pending prompt, then keeps
+        collecting whatever else arrives within AI_BATCH_WINDOW_SECONDS (up to
+        AI_BATCH_MAX_SIZE prompts) and issues them as one chain.abatch call.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._batch_queue.get()]
+            deadline = loop.time() + settings.AI_BATCH_WINDOW_SECONDS
+            while len(batch) < settings.AI_BATCH_MAX_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._batch_queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = await self.chain.abatch([variables for variables, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    async def _invoke_batched(self, variables: Dict[str, str]):
+        """ Enqueue one prompt's variables and await its slot in the next coalesced batch. """
+        self._ensure_batch_worker()
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._batch_queue.put((variables, fut))
+        # Bound tail latency: a stuck batch must not hang the request forever.
+        return await asyncio.wait_for(fut, timeout=settings.AI_BATCH_TIMEOUT_SECONDS)
+
     def _clean_json_string(self, raw_string: str) -> str:
         """ Helper to remove potential markdown backticks and surrounding whitespace. """
-        cleaned = raw_string.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[len("```json"):].strip()
-        elif cleaned.startswith("```"):
-             cleaned = cleaned[len("```"):].strip()
-
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-len("```")].strip()
-        return cleaned
+        match = _FENCE_RE.match(raw_string)
+        return match.group(1) if match else raw_string.strip()
 
     async def process_content(self, request_data: AIProcessingRequest) -> AIProcessingResponse:
         """
@@ -81,31 +211,67 @@ class AIProcessorService:
             An AIProcessingResponse object containing the status, structured output (if successful),
             and any error messages.
         """
-        logger.info(f"Starting AI processing for document_id: {request_data.document_id}")
+        logger.info("Starting AI processing for document_id: %s", request_data.document_id)
+
+        # 0a. Hard-cap the input size locally rather than letting Gemini reject
+        # an oversize prompt after a full (large) upload round-trip.
+        truncation_warning: Optional[str] = None
+        pdf_content = request_data.pdf_content
+        estimated_tokens = self._estimate_tokens(pdf_content)
+        if estimated_tokens > settings.AI_MAX_INPUT_TOKENS:
+            max_chars = settings.AI_MAX_INPUT_TOKENS * 4
+            pdf_content = pdf_content[:max_chars] + "\n\n[... content truncated to fit the model context window ...]"
+            truncation_warning = (
+                f"Warning: document content (~{estimated_tokens} tokens) exceeded the "
+                f"{settings.AI_MAX_INPUT_TOKENS}-token input cap and was truncated."
+            )
+            logger.warning(
+                "Truncated content for doc %s: ~%d tokens > cap of %d.",
+                request_data.document_id, estimated_tokens, settings.AI_MAX_INPUT_TOKENS,
+            )
 
-        # 1. Construct the prompt using LangChain templates
-        # We combine the user-provided system prompt with the actual PDF content
-        # Note: Some models work better if the system instructions are part of the first "human" message or use convert_system_message_to_human=True
-        messages = [
-            SystemMessage(content=request_data.system_prompt),
-            HumanMessage(content=f"Here is the document content to process:\n\n---\n\n{request_data.pdf_content}\n\n---")
-        ]
-        # Alternative: If convert_system_message_to_human=False or model prefers combined prompt:
-        # combined_prompt_text = f"{request_data.system_prompt}\n\nDocument Content:\n{request_data.pdf_content}"
-        # messages = [HumanMessage(content=combined_prompt_text)]
+        # 0b. Check the result cache before doing any work
+        cache_key = self._cache_key(request_data.system_prompt, pdf_content)
+        async with self._cache_lock:
+            cached_output = self._result_cache.get(cache_key)
+        if cached_output is not None:
+            logger.info("AI result cache hit for document_id: %s", request_data.document_id)
+            return AIProcessingResponse(
+                document_id=request_data.document_id,
+                status="success",
+                ai_structured_output=cached_output,
+                model_used=settings.AI_MODEL_NAME,
+            )
 
+        # 1. Construct the prompt(s)
+        # We combine the user-provided system prompt with the actual PDF content.
+        # Long documents are split on paragraph boundaries and fanned out as
+        # parallel model calls (prefill cost scales with prompt length), then
+        # their structured outputs are merged back into one result.
+        if len(pdf_content) > settings.AI_CHUNK_THRESHOLD_CHARS:
+            chunks = self._split_content(pdf_content, settings.AI_CHUNK_SIZE_CHARS)
+            logger.info(
+                "Content for doc %s is %d chars; splitting into %d parallel chunks.",
+                request_data.document_id, len(pdf_content), len(chunks),
+            )
+        else:
+            chunks = [pdf_content]
 
         # 2. Invoke the LLM
         try:
-            logger.debug(f"Invoking AI model '{settings.AI_MODEL_NAME}'...")
-            # Use .ainvoke for async compatibility if LangChain supports it well for this provider
-            # response = await self.llm.ainvoke(messages)
-            # For simplicity and broader compatibility initially, use synchronous invoke
-            # Ensure your FastAPI route allows for potentially longer synchronous operations or run in a thread pool executor later if needed
-            response = self.llm.invoke(messages)
-            raw_ai_output = response.content.strip()
-            logger.debug(f"Received raw response from AI (length: {len(raw_ai_output)} chars)")
-            # logger.debug(f"Raw AI Output: {raw_ai_output[:500]}...") # Log snippet for debugging
+            logger.debug("Invoking AI model '%s'...", settings.AI_MODEL_NAME)
+            if len(chunks) == 1:
+                # The batcher coalesces concurrent requests into one abatch call; the
+                # async path also keeps the Gemini round-trip off the event loop.
+                response = await self._invoke_batched(self._build_variables(request_data.system_prompt, chunks[0]))
+                raw_outputs = [response.content.strip()]
+            else:
+                responses = await self.chain.abatch(
+                    [self._build_variables(request_data.system_prompt, chunk) for chunk in chunks],
+                    config={"max_concurrency": settings.AI_CHUNK_MAX_CONCURRENCY},
+                )
+                raw_outputs = [response.content.strip() for response in responses]
+            logger.debug("Received %d raw response(s) from AI", len(raw_outputs))
 
         # --- Specific Error Handling (Example - needs testing with actual API errors) ---
         # except GoogleAPIError as e: # Catch specific Google API errors if needed
@@ -118,7 +284,7 @@ class AIProcessorService:
         #     )
         # --- General Error Handling ---
         except Exception as e:
-            logger.error(f"Error during AI model invocation for doc {request_data.document_id}: {e}", exc_info=True)
+            logger.error("Error during AI model invocation for doc %s: %s", request_data.document_id, e, exc_info=True)
             return AIProcessingResponse(
                 document_id=request_data.document_id,
                 status="error",
@@ -131,40 +297,46 @@ class AIProcessorService:
         error_message: Optional[str] = None
         status = "success" # Assume success unless parsing fails
 
-        cleaned_output = self._clean_json_string(raw_ai_output)
+        cleaned_output = ""
         try:
-            structured_output = json.loads(cleaned_output)
-            logger.info(f"Successfully parsed JSON output from AI for doc {request_data.document_id}")
+            parsed_outputs = []
+            for raw_output in raw_outputs:
+                cleaned_output = self._clean_json_string(raw_output)
+                # orjson parses large structured-extraction payloads several times
+                # faster than the stdlib json module.
+                parsed_outputs.append(orjson.loads(cleaned_output))
+            structured_output = parsed_outputs[0] if len(parsed_outputs) == 1 else self._merge_outputs(parsed_outputs)
+            logger.info("Successfully parsed JSON output from AI for doc %s", request_data.document_id)
 
-        except json.JSONDecodeError as e:
-            logger.warning(f"Failed to parse AI response as JSON for doc {request_data.document_id}. Error: {e}", exc_info=True)
-            logger.warning(f"Cleaned AI Output that failed parsing: {cleaned_output[:500]}...") # Log snippet
+        except orjson.JSONDecodeError as e:
+            # exc_info would format a full traceback per failure; the decode error message is enough here
+            logger.warning("Failed to parse AI response as JSON for doc %s. Error: %s", request_data.document_id, e)
+            logger.warning("Cleaned AI Output that failed parsing: %.500s...", cleaned_output) # Log snippet
             status = "error"
             error_message = f"AI model response was not valid JSON. Parse Error: {e}. Raw (cleaned) start: '{cleaned_output[:100]}...'"
             # Optionally, you could include the raw (cleaned) output in the response if needed for debugging
             # structured_output = {"raw_output": cleaned_output} # Or add a separate field
 
         except Exception as e: # Catch unexpected parsing errors
-             logger.error(f"Unexpected error parsing AI response for doc {request_data.document_id}: {e}", exc_info=True)
+             logger.error("Unexpected error parsing AI response for doc %s: %s", request_data.document_id, e, exc_info=True)
              status = "error"
              error_message = f"Unexpected error parsing AI output: {str(e)}"
 
+        # Cache only clean successes so transient failures are retried
+        if status == "success":
+            async with self._cache_lock:
+                self._result_cache[cache_key] = structured_output
 
-        # 4. Return the structured response
+        # 4. Return the structured response (surfacing truncation as a warning)
         return AIProcessingResponse(
             document_id=request_data.document_id,
             status=status,
             ai_structured_output=structured_output,
             model_used=settings.AI_MODEL_NAME,
-            error_message=error_message
+            error_message=error_message or truncation_warning
         )
 
 
-# Create a singleton instance for easy use
-try:
-    ai_processor_service = AIProcessorService()
-except AIConfigurationError as e:
-    # If the service can't be initialized (e.g., missing key), log it and set the instance to None.
-    # Code using this service will need to check if it's None.
-    logger.critical(f"AI Processor Service failed to initialize: {e}. AI functionality will be unavailable.")
-    ai_processor_service = None
\ No newline at end of file
+# NOTE: No module-level singleton here. Constructing the service builds the
+# Gemini client (credential validation etc.), which should happen in the
+# FastAPI lifespan — see app.main — not as an import side effect.
\ No newline at end of file
@@ -1,15 +1,33 @@
 # app/services/pdf_extractor.py
 
+import asyncio
 import io
-from typing import List
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+import zstandard
 
 # PDF Extraction Library
 from pypdf import PdfReader
 from pypdf.errors import PdfReadError
 
+# Preferred fast backend: PyMuPDF's C core extracts text roughly an order of
+# magnitude faster than pure-Python pypdf on the same documents. pypdf stays
+# as the fallback for environments without a MuPDF wheel.
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
 # MinIO Integration
+import anyio.to_thread
 from minio.error import S3Error, MinioException
-from .storage import storage_service  # Import the singleton instance
+from .storage import storage_service, get_minio_limiter  # Import the singleton instance
 from app.core.config import settings
 
 # Error Handling & Logging
@@ -28,41 +46,450 @@ class PdfNotFoundError(Exception):
 
 logger = logging.getLogger(__name__)
 
+# Dedicated process pool for the CPU-bound pypdf work. Parsing in the request
+# process would pin the event loop (and the GIL) for seconds on large PDFs;
+# a pool of worker processes lets extractions run truly in parallel.
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """ Lazily create the shared extraction pool (reused across requests). """
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1))
+    return _pdf_pool
+
+
+def _extract_text_fitz(pdf_data: bytes, object_name: str) -> str:
+    """
+    Whole-document extraction with PyMuPDF inside a pool worker. The page
+    loop runs in MuPDF's C core, so one worker call per document is faster
+    than fanning pages out the way the pypdf fallback does.
+
+    Raises:
+        PdfExtractionError: If the PDF is encrypted, corrupted, or unreadable.
+    """
+    try:
+        doc = fitz.open(stream=pdf_data, filetype="pdf")
+    except (fitz.FileDataError, RuntimeError, ValueError) as e:
+        logger.error(f"Failed to read PDF structure for {object_name}: {e}")
+        raise PdfExtractionError(f"Failed to read PDF '{object_name}'. It might be corrupted or not a valid PDF. Error: {e}")
+
+    # Accumulate into one StringIO instead of a list + join, which would walk
+    # and copy the (potentially tens of MB of) text a second time.
+    buffer = io.StringIO()
+    try:
+        if doc.needs_pass and not doc.authenticate(""):
+            logger.warning(f"PDF {object_name} is encrypted.")
+            raise PdfExtractionError(f"PDF '{object_name}' is encrypted and password protected.")
+
+        logger.debug(f"Reading {doc.page_count} pages from {object_name} via PyMuPDF...")
+        for page in doc:
+            page_text = page.get_text("text")
+            if page_text:
+                buffer.write(page_text.strip())
+                buffer.write("\n\n") # Join pages with double newline for readability
+    except PdfExtractionError:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error during PDF parsing for {object_name}: {e}", exc_info=True)
+        raise PdfExtractionError(f"Unexpected error processing PDF '{object_name}': {e}")
+    finally:
+        doc.close()
+
+    full_text = buffer.getvalue().rstrip("\n")
+    if not full_text:
+        logger.warning(f"No text could be extracted from PDF {object_name} (possibly image-based or empty).")
+        return ""
+
+    logger.info(f"Successfully extracted ~{len(full_text)} characters from {object_name}.")
+    return full_text
+
+
+# How many leading pages the image-only probe samples. Scanned documents are
+# almost always uniform, so a small sample is representative.
+_IMAGE_PROBE_PAGES = 3
+
+
+def _probe_image_only(pdf_data: bytes, object_name: str) -> bool:
+    """
+    Samples the first few pages to detect scanned/image-only PDFs before the
+    full extraction fans out. A page with no extractable text but image
+    XObjects in its resources is almost certainly a scan; if every sampled
+    page looks like that, the whole document is treated as image-only and the
+    (expensive) full parse is skipped.
+
+    Returns True when the sampled pages are image-only, False otherwise
+    (including on any probe failure — the full pipeline is the authority).
+    """
+    pdf_stream = io.BytesIO(pdf_data)
+    try:
+        # strict=False: the probe should tolerate spec violations that the
+        # full extraction path would also shrug off, not fail fast on them.
+        reader = PdfReader(pdf_stream, strict=False)
+        if reader.is_encrypted and not reader.decrypt(''):
+            return False
+
+        sample = reader.pages[:_IMAGE_PROBE_PAGES]
+        if not sample:
+            return False
+
+        saw_image = False
+        for page in sample:
+            page_text = page.extract_text()
+            if page_text and page_text.strip():
+                return False
+            resources = page.get("/Resources") or {}
+            xobjects = resources.get("/XObject") or {}
+            for xobject in xobjects.values():
+                if xobject.get_object().get("/Subtype") == "/Image":
+                    saw_image = True
+                    break
+        return saw_image
+    except Exception as probe_error:
+        logger.debug(f"Image-only probe failed for {object_name}: {probe_error}")
+        return False
+    finally:
+        pdf_stream.close()
+
+
+def _page_count_sync(pdf_data: bytes, object_name: str) -> int:
+    """
+    Opens the document in a pool worker, validates encryption, and returns the
+    page count. Runs once per document before the per-page fan-out.
+
+    Must stay a module-level function taking plain bytes so it can be pickled
+    across the process boundary.
+
+    Raises:
+        PdfExtractionError: If the PDF is encrypted, corrupted, or unreadable.
+    """
+    pdf_stream = io.BytesIO(pdf_data)
+    try:
+        # strict=False: tolerate the spec violations real-world PDFs are full
+        # of instead of raising on recoverable structure issues.
+        reader = PdfReader(pdf_stream, strict=False)
+
+        # Check for encryption (pypdf handles basic password attempts if needed,
+        # but we'll explicitly fail if encrypted without a password mechanism)
+        if reader.is_encrypted:
+            # Attempt decryption with an empty password, fails for most protected PDFs
+            try:
+                # You could add password handling logic here if needed
+                if not reader.decrypt(''):
+                    logger.warning(f"PDF {object_name} is encrypted.")
+                    raise PdfExtractionError(f"PDF '{object_name}' is encrypted and password protected.")
+                else:
+                    logger.info(f"PDF {object_name} was encrypted but decrypted successfully (likely no password).")
+            except NotImplementedError:
+                # Some encryption types aren't supported by pypdf
+                logger.warning(f"PDF {object_name} uses unsupported encryption.")
+                raise PdfExtractionError(f"PDF '{object_name}' uses unsupported encryption.")
+
+        return len(reader.pages)
+
+    except PdfExtractionError:
+        raise
+    except PdfReadError as e:
+        # Known, expected failure mode — the message carries what we need,
+        # so skip the traceback formatting that exc_info would trigger.
+        logger.error(f"Failed to read PDF structure for {object_name}: {e}")
+        raise PdfExtractionError(f"Failed to read PDF '{object_name}'. It might be corrupted or not a valid PDF. Error: {e}")
+    except Exception as e: # Catch unexpected pypdf errors
+        logger.error(f"Unexpected error during PDF parsing for {object_name}: {e}", exc_info=True)
+        raise PdfExtractionError(f"Unexpected error processing PDF '{object_name}': {e}")
+    finally:
+        pdf_stream.close() # Close the BytesIO stream
+
+
+def _extract_page_range(pdf_data: bytes, start: int, stop: int, object_name: str) -> List[str]:
+    """
+    Extracts the text of a contiguous range of pages inside one pool worker.
+    Batching pages per worker means one PdfReader — and thus one pass of
+    font/resource-dictionary resolution — serves the whole range, instead of
+    every page paying that setup cost in its own reader.
+
+    Returns the stripped text per page ("" for pages without extractable
+    text — per-page failures are logged and swallowed so one bad page
+    doesn't sink the document).
+    """
+    pdf_stream = io.BytesIO(pdf_data)
+    texts: List[str] = []
+    try:
+        reader = PdfReader(pdf_stream, strict=False)
+        if reader.is_encrypted:
+            reader.decrypt('')
+        for page_index in range(start, stop):
+            try:
+                # "plain" mode skips pypdf's layout reconstruction and
+                # orientations limited to upright text skips the per-glyph
+                # rotation handling — both are pure cost for LLM input,
+                # which doesn't care about visual layout. Tradeoff: rotated
+                # text (watermarks, sideways table headers) is dropped.
+                page_text = reader.pages[page_index].extract_text(
+                    extraction_mode="plain", orientations=(0,)
+                )
+                texts.append(page_text.strip() if page_text else "")
+            except (PdfReadError, KeyError, ValueError, UnicodeDecodeError, TypeError) as page_error:
+                # The set pypdf actually raises from broken content streams.
+                # No exc_info here: on scanned/corrupt documents every page
+                # can land in this handler, and formatting O(pages)
+                # tracebacks dominates runtime.
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning(f"Could not extract text from page {page_index+1} of {object_name}: {page_error!r}")
+                texts.append("")
+            finally:
+                # Drop the consumed PageObject so long ranges don't pin every
+                # prior page's parsed content streams in memory — peak RSS on
+                # thousand-page documents otherwise grows with range length.
+                # flattened_pages is populated by the reader.pages access
+                # above; the getattr guards against pypdf internals changing.
+                flattened = getattr(reader, "flattened_pages", None)
+                if flattened is not None:
+                    flattened[page_index] = None
+        return texts
+    finally:
+        pdf_stream.close()
+
+
 class PdfExtractorService:
     """
     Service responsible for retrieving PDF files from object storage
     and extracting their text content.
     """
 
-    async def extract_text_from_pdf(self, object_name: str) -> str:
+    def __init__(self):
+        # Extracted-text cache keyed on (object_name, etag): repeat extractions
+        # of an unchanged object skip both the MinIO GET and the parse. Failed
+        # parses are cached too (negative entries), so known-broken PDFs don't
+        # get re-parsed on every retry. Values are (timestamp, text-or-error).
+        self._text_cache: "OrderedDict[Tuple[str, str], Tuple[float, Union[str, PdfExtractionError]]]" = OrderedDict()
+        self._text_cache_lock = asyncio.Lock()
+        # Admission control for extractions: each in-flight document pins a
+        # full copy of its bytes in the pool workers, so cap concurrent
+        # documents at core count to bound memory under a request burst.
+        self._extract_semaphore = asyncio.Semaphore(os.cpu_count() or 2)
+
+    def _stat_etag(self, object_name: str) -> Optional[str]:
+        """ Cheap HEAD for the object's current ETag; None when stat fails. """
+        try:
+            return storage_service.client.stat_object(
+                settings.MINIO_BUCKET_NAME, object_name
+            ).etag
+        except Exception:
+            return None
+
+    async def _text_cache_get(self, key: Tuple[str, str]) -> Optional[Union[str, PdfExtractionError]]:
+        async with self._text_cache_lock:
+            entry = self._text_cache.get(key)
+            if entry is None:
+                return None
+            timestamp, value = entry
+            if time.monotonic() - timestamp > settings.PDF_TEXT_CACHE_TTL_SECONDS:
+                del self._text_cache[key]
+                return None
+            self._text_cache.move_to_end(key)
+            return value
+
+    async def _text_cache_put(self, key: Tuple[str, str], value: Union[str, PdfExtractionError]) -> None:
+        async with self._text_cache_lock:
+            self._text_cache[key] = (time.monotonic(), value)
+            self._text_cache.move_to_end(key)
+            while len(self._text_cache) > settings.PDF_TEXT_CACHE_MAX_ENTRIES:
+                self._text_cache.popitem(last=False)
+
+    async def _extract_parallel(self, pdf_data: bytes, source_name: str) -> str:
         """
-        Retrieves a PDF from MinIO storage and extracts its text content.
+        Fans the pages of one document out across the process pool and joins
+        the per-page texts in order. Extraction of an N-page PDF scales with
+        core count instead of running pages serially.
+        """
+        async with self._extract_semaphore:
+            loop = asyncio.get_running_loop()
+            pool = _get_pdf_pool()
 
-        Args:
-            object_name: The name of the PDF object within the MinIO bucket
-                         (e.g., "a1b2c3d4-uuid.pdf").
+            # Cheap probe first: scanned/image-only PDFs would otherwise pay the
+            # full per-page extraction fan-out just to produce an empty string.
+            if await loop.run_in_executor(pool, _probe_image_only, pdf_data, source_name):
+                logger.warning(f"PDF {source_name} appears to be image-only (scanned); skipping text extraction.")
+                return ""
 
-        Returns:
-            The extracted text content as a single string.
+            if fitz is not None:
+                return await loop.run_in_executor(pool, _extract_text_fitz, pdf_data, source_name)
+
+            num_pages = await loop.run_in_executor(pool, _page_count_sync, pdf_data, source_name)
+            logger.debug(f"Reading {num_pages} pages from {source_name}...")
+            if num_pages == 0:
+                return ""
+
+            # Split the document into one contiguous range per worker: each
+            # range shares a reader (one font-cache warmup per worker call
+            # instead of per page). gather preserves submission order, so the
+            # ranges come back ordered.
+            num_workers = min(num_pages, _get_pdf_pool()._max_workers)
+            pages_per_worker = -(-num_pages // num_workers)  # ceil division
+            ranges = [
+                (start, min(start + pages_per_worker, num_pages))
+                for start in range(0, num_pages, pages_per_worker)
+            ]
+            range_texts = await asyncio.gather(*(
+                loop.run_in_executor(pool, _extract_page_range, pdf_data, start, stop, source_name)
+                for start, stop in ranges
+            ))
+            page_texts = [text for texts in range_texts for text in texts]
+
+            # Single StringIO accumulator — no intermediate filtered list and no
+            # second full pass over the text for a join.
+            buffer = io.StringIO()
+            for text in page_texts:
+                if text:
+                    buffer.write(text)
+                    buffer.write("\n\n") # Join pages with double newline for readability
+
+            full_text = buffer.getvalue().rstrip("\n")
+            if not full_text:
+                logger.warning(f"No text could be extracted from PDF {source_name} (possibly image-based or empty).")
+                # Decide whether to return empty string or raise error - empty string seems reasonable
+                return ""
+
+            logger.info(f"Successfully extracted ~{len(full_text)} characters from {source_name}.")
+            return full_text
+
+    async def _extract_with_mutool(self, pdf_data: bytes, source_name: str) -> str:
+        """
+        Out-of-process fallback for pathological PDFs: MuPDF's `mutool` CLI
+        (C core, no Python object overhead) handles documents that take the
+        in-process path past its time budget.
+
+        Raises:
+            PdfExtractionError: If mutool is not installed or fails.
+        """
+        mutool = shutil.which("mutool")
+        if mutool is None:
+            raise PdfExtractionError(
+                f"Extraction of '{source_name}' timed out and no 'mutool' binary "
+                f"is available for the subprocess fallback."
+            )
+
+        # mutool reads from a file, not stdin — spill the bytes to a temp file.
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(pdf_data)
+            tmp_path = tmp.name
+        try:
+            process = await asyncio.create_subprocess_exec(
+                mutool, "draw", "-F", "txt", "-o", "-", tmp_path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await process.communicate()
+            if process.returncode != 0:
+                raise PdfExtractionError(
+                    f"mutool failed on '{source_name}' (exit {process.returncode}): "
+                    f"{stderr.decode(errors='replace').strip()}"
+                )
+            return stdout.decode(errors="replace").strip()
+        finally:
+            os.unlink(tmp_path)
+
+    async def _extract_with_timeout(self, pdf_data: bytes, source_name: str) -> str:
+        """
+        Runs the normal in-process extraction under the configured time
+        budget; pathological PDFs that blow through it fall back to mutool
+        so the long tail never holds a pool worker hostage indefinitely.
+        """
+        try:
+            return await asyncio.wait_for(
+                self._extract_parallel(pdf_data, source_name),
+                timeout=settings.PDF_EXTRACT_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"In-process extraction of {source_name} exceeded "
+                f"{settings.PDF_EXTRACT_TIMEOUT_SECONDS}s; falling back to mutool."
+            )
+            return await self._extract_with_mutool(pdf_data, source_name)
+
+    # --- Compressed extracted-text sidecars ---
+    # The in-memory cache dies with the process; a zstd-compressed
+    # "<object>.txt.zst" sibling in the bucket survives restarts and is
+    # shared across replicas, turning a multi-second re-extraction into a
+    # small download + decompress.
+
+    @staticmethod
+    def _sidecar_name(object_name: str) -> str:
+        return f"{object_name}.txt.zst"
+
+    def _fetch_text_sidecar(self, object_name: str) -> Optional[str]:
+        """ Returns the sidecar's decompressed text, or None when absent/broken. """
+        sidecar = self._sidecar_name(object_name)
+        client = storage_service.client
+        try:
+            # HEAD first: on the common miss path this avoids a wasted GET.
+            client.stat_object(settings.MINIO_BUCKET_NAME, sidecar)
+        except Exception:
+            return None
+        response = None
+        try:
+            response = client.get_object(settings.MINIO_BUCKET_NAME, sidecar)
+            return zstandard.ZstdDecompressor().decompress(response.read()).decode("utf-8")
+        except Exception as e:
+            logger.warning(f"Failed to read text sidecar for {object_name}: {e}")
+            return None
+        finally:
+            if response:
+                response.close()
+                response.release_conn()
+
+    def _store_text_sidecar(self, object_name: str, full_text: str) -> None:
+        """ Best-effort sidecar write; failures only cost the next extraction. """
+        try:
+            payload = zstandard.ZstdCompressor().compress(full_text.encode("utf-8"))
+            storage_service.client.put_object(
+                bucket_name=settings.MINIO_BUCKET_NAME,
+                object_name=self._sidecar_name(object_name),
+                data=io.BytesIO(payload),
+                length=len(payload),
+                content_type="application/zstd",
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store text sidecar for {object_name}: {e}")
+
+    def _fetch_pdf_bytes(self, object_name: str) -> bytes:
+        """
+        Fetches the raw PDF bytes for an object from MinIO.
 
         Raises:
             PdfNotFoundError: If the specified object_name is not found in MinIO.
-            PdfExtractionError: If the PDF file is corrupted, password-protected
-                                (and cannot be decrypted), or cannot be read.
             HTTPException: For underlying storage connection issues or unexpected errors.
-                           (Could refine to use custom exceptions more broadly).
         """
-        logger.info(f"Attempting to extract text from PDF object: {object_name}")
-        pdf_data = None
         response = None
         try:
-            # 1. Fetch PDF bytes from MinIO
             response = storage_service.client.get_object(
                 bucket_name=settings.MINIO_BUCKET_NAME,
                 object_name=object_name
             )
-            pdf_data = response.read()
+            # pypdf needs the complete file (the xref lives at the end), so
+            # the download can't be pipelined with parsing — but the GET
+            # response carries Content-Length, so the destination buffer can
+            # be allocated once at its exact final size and filled in 1 MiB
+            # chunks. No BytesIO regrowth/copies for multi-MB objects.
+            content_length = response.headers.get("Content-Length")
+            if content_length and content_length.isdigit():
+                buffer = memoryview(bytearray(int(content_length)))
+                written = 0
+                while written < len(buffer):
+                    chunk = response.read(min(1024 * 1024, len(buffer) - written))
+                    if not chunk:
+                        break
+                    buffer[written:written + len(chunk)] = chunk
+                    written += len(chunk)
+                pdf_data = bytes(buffer[:written])
+            else:
+                fallback = io.BytesIO()
+                shutil.copyfileobj(response, fallback, length=1024 * 1024)
+                pdf_data = fallback.getvalue()
             logger.debug(f"Successfully retrieved {len(pdf_data)} bytes for {object_name}")
+            return pdf_data
 
         except S3Error as e:
             if e.code == 'NoSuchKey':
@@ -81,81 +508,115 @@ class PdfExtractorService:
                 detail=f"Storage service connection error: {e}"
             )
         except Exception as e: # Catch unexpected errors during fetch
-             logger.error(f"Unexpected error retrieving PDF {object_name}: {e}", exc_info=True)
-             raise HTTPException(
-                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                 detail=f"Unexpected error retrieving PDF file."
-             )
+            logger.error(f"Unexpected error retrieving PDF {object_name}: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Unexpected error retrieving PDF file."
+            )
         finally:
             # IMPORTANT: Ensure the MinIO connection is released
             if response:
                 response.close()
                 response.release_conn()
 
+    async def extract_text_from_bytes(self, pdf_data: bytes, source_name: str = "<upload>") -> str:
+        """
+        Extracts text directly from in-memory PDF bytes, skipping storage.
+
+        Used on the upload hot path, where the request already holds the bytes
+        and re-downloading the just-stored object from MinIO would double the
+        bytes moved (one extra GET + RTT per request).
+
+        Raises:
+            PdfExtractionError: If the PDF is empty, encrypted, corrupted,
+                                or cannot be read.
+        """
         if not pdf_data:
-             # Should have been caught by exceptions, but as a safeguard
-             logger.error(f"PDF data was empty for {object_name} despite no fetch error.")
-             raise PdfExtractionError(f"Failed to retrieve valid data for PDF '{object_name}'.")
+            raise PdfExtractionError(f"No PDF data provided for '{source_name}'.")
 
-        # 2. Prepare Bytes for pypdf
-        pdf_stream = io.BytesIO(pdf_data)
+        return await self._extract_with_timeout(pdf_data, source_name)
 
-        # 3. Extract Text using pypdf
-        extracted_texts: List[str] = []
-        try:
-            reader = PdfReader(pdf_stream)
-
-            # Check for encryption (pypdf handles basic password attempts if needed,
-            # but we'll explicitly fail if encrypted without a password mechanism)
-            if reader.is_encrypted:
-                 # Attempt decryption with an empty password, fails for most protected PDFs
-                 try:
-                     # You could add password handling logic here if needed
-                     if not reader.decrypt(''):
-                         logger.warning(f"PDF {object_name} is encrypted.")
-                         raise PdfExtractionError(f"PDF '{object_name}' is encrypted and password protected.")
-                     else:
-                          logger.info(f"PDF {object_name} was encrypted but decrypted successfully (likely no password).")
-                 except NotImplementedError:
-                     # Some encryption types aren't supported by pypdf
-                     logger.warning(f"PDF {object_name} uses unsupported encryption.")
-                     raise PdfExtractionError(f"PDF '{object_name}' uses unsupported encryption.")
-
-
-            # Iterate through pages and extract text
-            num_pages = len(reader.pages)
-            logger.debug(f"Reading {num_pages} pages from {object_name}...")
-            for i, page in enumerate(reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text: # Add text only if content exists
-                        extracted_texts.append(page_text.strip())
-                    # else:
-                    #     logger.debug(f"Page {i+1}/{num_pages} of {object_name} had no extractable text.")
-                except Exception as page_error:
-                     # Log error for specific page but try to continue
-                     logger.warning(f"Could not extract text from page {i+1} of {object_name}: {page_error}")
-
-
-        except PdfReadError as e:
-            logger.error(f"Failed to read PDF structure for {object_name}: {e}", exc_info=True)
-            raise PdfExtractionError(f"Failed to read PDF '{object_name}'. It might be corrupted or not a valid PDF. Error: {e}")
-        except Exception as e: # Catch unexpected pypdf errors
-            logger.error(f"Unexpected error during PDF parsing for {object_name}: {e}", exc_info=True)
-            raise PdfExtractionError(f"Unexpected error processing PDF '{object_name}': {e}")
-        finally:
-             pdf_stream.close() # Close the BytesIO stream
+    async def extract_text_from_pdf(self, object_name: str) -> str:
+        """
+        Retrieves a PDF from MinIO storage and extracts its text content.
 
+        The bytes are fetched once here, then handed to a worker process so
+        the CPU-bound parsing never runs on the event loop.
 
-        # 4. Combine and Return Text
-        if not extracted_texts:
-            logger.warning(f"No text could be extracted from PDF {object_name} (possibly image-based or empty).")
-            # Decide whether to return empty string or raise error - empty string seems reasonable
-            return ""
+        Args:
+            object_name: The name of the PDF object within the MinIO bucket
+                         (e.g., "a1b2c3d4-uuid.pdf").
+
+        Returns:
+            The extracted text content as a single string.
 
-        full_text = "\n\n".join(extracted_texts) # Join pages with double newline for readability
-        logger.info(f"Successfully extracted ~{len(full_text)} characters from {object_name}.")
+        Raises:
+            PdfNotFoundError: If the specified object_name is not found in MinIO.
+            PdfExtractionError: If the PDF file is corrupted, password-protected
+                                (and cannot be decrypted), or cannot be read.
+            HTTPException: For underlying storage connection issues or unexpected errors.
+                           (Could refine to use custom exceptions more broadly).
+        """
+        logger.info(f"Attempting to extract text from PDF object: {object_name}")
+
+        # A HEAD for the ETag is far cheaper than re-downloading and re-parsing;
+        # on a cache hit for an unchanged object we skip both.
+        etag = await anyio.to_thread.run_sync(
+            self._stat_etag, object_name, limiter=get_minio_limiter()
+        )
+        cache_key = (object_name, etag) if etag else None
+        if cache_key is not None:
+            cached = await self._text_cache_get(cache_key)
+            if isinstance(cached, PdfExtractionError):
+                logger.info(f"Returning cached extraction failure for {object_name}.")
+                raise cached
+            if cached is not None:
+                logger.info(f"Extracted-text cache hit for {object_name}.")
+                return cached
+
+        # On an in-memory miss, a compressed sidecar download still beats
+        # re-downloading and re-parsing the full PDF by orders of magnitude.
+        sidecar_text = await anyio.to_thread.run_sync(
+            self._fetch_text_sidecar, object_name, limiter=get_minio_limiter()
+        )
+        if sidecar_text is not None:
+            logger.info(f"Text sidecar hit for {object_name}.")
+            if cache_key is not None:
+                await self._text_cache_put(cache_key, sidecar_text)
+            return sidecar_text
+
+        # get_object + the chunked reads are synchronous urllib3 calls; run
+        # them on a limiter-bounded worker thread so concurrent requests
+        # download from MinIO in parallel instead of serializing on the loop.
+        pdf_data = await anyio.to_thread.run_sync(
+            self._fetch_pdf_bytes, object_name, limiter=get_minio_limiter()
+        )
+
+        if not pdf_data:
+            # Should have been caught by exceptions, but as a safeguard
+            logger.error(f"PDF data was empty for {object_name} despite no fetch error.")
+            raise PdfExtractionError(f"Failed to retrieve valid data for PDF '{object_name}'.")
+
+        try:
+            full_text = await self._extract_with_timeout(pdf_data, object_name)
+        except PdfExtractionError as e:
+            if cache_key is not None:
+                await self._text_cache_put(cache_key, e)
+            raise
+
+        if cache_key is not None:
+            await self._text_cache_put(cache_key, full_text)
+
+        # Fire-and-forget: the sidecar write happens off the response path,
+        # so the caller never waits on the extra PUT.
+        if full_text:
+            asyncio.create_task(
+                anyio.to_thread.run_sync(
+                    self._store_text_sidecar, object_name, full_text,
+                    limiter=get_minio_limiter(),
+                )
+            )
         return full_text
 
 # Create a singleton instance for easy use in other parts of the application
-pdf_extractor_service = PdfExtractorService()
\ No newline at end of file
+pdf_extractor_service = PdfExtractorService()
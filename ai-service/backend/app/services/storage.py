@@ -1,36 +1,94 @@
-import io
+import os
+import time
 import uuid
-from typing import BinaryIO, Tuple
+from functools import partial
+from typing import BinaryIO, Optional, Tuple
 
+import anyio
+import anyio.to_thread
+import urllib3
 from fastapi import HTTPException, UploadFile
 from minio import Minio
 from minio.error import MinioException, S3Error
 
 from app.core.config import settings
 
+# One token per concurrent MinIO operation, shared by every caller in the
+# process (uploads, downloads, stats). Bounds thread usage and matches the
+# connection pool below so threads never queue on a starved pool.
+_MINIO_CONCURRENCY = 16
 
+_minio_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+def get_minio_limiter() -> anyio.CapacityLimiter:
+    """ Lazily create the shared limiter (needs a running event loop). """
+    global _minio_limiter
+    if _minio_limiter is None:
+        _minio_limiter = anyio.CapacityLimiter(_MINIO_CONCURRENCY)
+    return _minio_limiter
+
+
+class _SizeCappedReader:
+    """
+    File-like wrapper that counts bytes as MinIO consumes the stream and
+    aborts the upload with a 413 once the configured cap is exceeded.
+    Lets us stream uploads without buffering the whole file first.
+    """
+    def __init__(self, stream: BinaryIO, max_size: int):
+        self._stream = stream
+        self._max_size = max_size
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self._max_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File size exceeds maximum allowed ({self._max_size // (1024 * 1024)}MB)."
+            )
+        return chunk
 
 
 class MinioStorageService:
     """ Service for interfacing with MinIO object """
+
+    # Class-level memo: the bucket only needs to be checked/created once per
+    # process, even if the service gets constructed again (e.g. in tests).
+    _bucket_ensured = False
+
+    # Health probes arrive at load-balancer frequency; only actually hit
+    # MinIO at most once per TTL window.
+    _HEALTH_TTL_SECONDS = 5.0
+
     def __init__(self):
         self.client = Minio(
             endpoint=settings.MINIO_ENDPOINT,
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_SECURE
+            secure=settings.MINIO_SECURE,
+            # Sized to the capacity limiter: with 16 worker threads hitting
+            # MinIO at once, the SDK's default pool would serialize them on
+            # too few keep-alive connections.
+            http_client=urllib3.PoolManager(num_pools=16, maxsize=32)
         )
+        self._health_checked_at = 0.0
+        self._health_ok = False
         # Ensure bucket exists on initialization
         self._ensure_bucket_exists()
 
     def _ensure_bucket_exists(self):
-        """ Create the bucket if it doesn't exist  """
-        try: 
+        """ Create the bucket if it doesn't exist (no-op once verified) """
+        if MinioStorageService._bucket_ensured:
+            return
+        try:
             if not self.client.bucket_exists(settings.MINIO_BUCKET_NAME):
                 self.client.make_bucket(settings.MINIO_BUCKET_NAME)
-                print(f"Bucket '{settings.MINIO_BUCKET_NAME}' created successfully.")   
+                print(f"Bucket '{settings.MINIO_BUCKET_NAME}' created successfully.")
             else:
                 print(f"Bucket '{settings.MINIO_BUCKET_NAME}' already exists.")
+            MinioStorageService._bucket_ensured = True
         except S3Error as err:
             print(f"Error checking/creating bucket: {err}")
             raise HTTPException(
@@ -38,36 +96,74 @@ class MinioStorageService:
                 detail=f"Storage service error: {str(err)}"
             )
 
-    async def store_file(self, file: UploadFile) -> Tuple[str, int]:
-        """ 
-        Store a file in MinIO 
+    async def store_file(self, file: UploadFile) -> Tuple[str, str, uuid.UUID, int]:
+        """
+        Store a file in MinIO
 
-        Args: 
+        Args:
             file (UploadFile): The file to be stored.
         Returns:
-            Tuple containing the storage path and file size 
-        Raises: 
+            Tuple containing the storage path, object name, document UUID,
+            and file size. The UUID is returned directly so callers don't
+            have to parse it back out of the object name.
+        Raises:
             HttpException : If the file cannot be stored.
         """
-        # this will help you generate a unique object name 
+        # this will help you generate a unique object name
         file_extension = file.filename.split(".")[-1] if file.filename else "pdf"
-        object_name = f"{uuid.uuid4()}.{file_extension}"
+        doc_uuid = uuid.uuid4()
+        object_name = f"{doc_uuid}.{file_extension}"
         storage_path = f"{settings.MINIO_BUCKET_NAME}/{object_name}"
 
-        # Read file content 
-        file_content = await file.read()
-        file_size = len(file_content)
+        # Starlette has already spooled the request body by the time this
+        # runs, so the true size is one seek away — oversized uploads get
+        # rejected here for free, before a single byte goes to MinIO.
+        file.file.seek(0, os.SEEK_END)
+        spooled_size = file.file.tell()
+        file.file.seek(0)
+        if spooled_size > settings.MAX_UPLOAD_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File size exceeds maximum allowed ({settings.MAX_UPLOAD_SIZE // (1024 * 1024)}MB)."
+            )
+
+        # Stream the underlying SpooledTemporaryFile straight into MinIO.
+        # length=-1 + part_size makes the SDK do a chunked multipart upload,
+        # so we never hold the full file in memory; the wrapper keeps
+        # enforcing the cap while the stream is consumed, as a backstop for
+        # callers that hand over a non-seekable stream.
+        capped_stream = _SizeCappedReader(file.file, settings.MAX_UPLOAD_SIZE)
+
+        # Big uploads (per the client's declared Content-Length) get larger
+        # parts pushed over parallel connections, so the PUT isn't serialized
+        # through a single TCP stream. Small files keep the cheap single-part
+        # path — parallelism below ~64MB just adds connection overhead.
+        declared_size = file.headers.get("content-length")
+        is_large = declared_size and declared_size.isdigit() and int(declared_size) > 64 * 1024 * 1024
+        upload_kwargs = (
+            {"part_size": 16 * 1024 * 1024, "num_parallel_uploads": 4}
+            if is_large
+            else {"part_size": 10 * 1024 * 1024}
+        )
 
         try:
-            # Store file in MinIO
-            self.client.put_object(
-                bucket_name=settings.MINIO_BUCKET_NAME,
-                object_name=object_name,
-                data=io.BytesIO(file_content),  # Fixed typo: 'date' to 'data'
-                length=file_size,
-                content_type=file.content_type or "application/pdf"
+            # put_object is synchronous (urllib3 underneath), so run it on a
+            # worker thread — otherwise the whole multipart upload would block
+            # the event loop and stall every other in-flight request. The
+            # shared limiter bounds concurrent MinIO threads process-wide.
+            await anyio.to_thread.run_sync(
+                partial(
+                    self.client.put_object,
+                    bucket_name=settings.MINIO_BUCKET_NAME,
+                    object_name=object_name,
+                    data=capped_stream,
+                    length=-1,
+                    content_type=file.content_type or "application/pdf",
+                    **upload_kwargs
+                ),
+                limiter=get_minio_limiter()
             )
-            return storage_path, file_size
+            return storage_path, object_name, doc_uuid, capped_stream.bytes_read
         except MinioException as err:
             raise HTTPException(
                 status_code=500,
@@ -75,14 +171,20 @@ class MinioStorageService:
             )
 
     def check_health(self) -> bool:
-        """Check if MinIO is reachable and the bucket exists"""
+        """Check if MinIO is reachable and the bucket exists (TTL-cached)"""
+        now = time.monotonic()
+        if now - self._health_checked_at < self._HEALTH_TTL_SECONDS:
+            return self._health_ok
+
         try:
             # Simple operation to verify connection
             self.client.bucket_exists(settings.MINIO_BUCKET_NAME)
-            return True
+            self._health_ok = True
         except Exception as e:
             print(f"MinIO health check failed: {e}")
-            return False
+            self._health_ok = False
+        self._health_checked_at = now
+        return self._health_ok
 
 
 # Create a singleton instance